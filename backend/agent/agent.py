@@ -5,11 +5,16 @@ This module defines the root agent that handles user conversations and
 delegates memory operations to the Memory Agent via tools.
 """
 
+import io
+import logging
+
 from google.adk.agents import Agent
 
 from .memory import process_memory_update
 from .tools import get_all_personal_info, get_historical_facts
 
+logger = logging.getLogger(__name__)
+
 
 async def store_personal_info(user_info: str) -> str:
     """
@@ -39,22 +44,22 @@ async def retrieve_personal_info() -> str:
     Returns:
         str: Formatted string of all known personal information
     """
-    print("Retrieving current personal information...")
+    logger.debug("Retrieving current personal information...")
     facts_by_entity = await get_all_personal_info()
 
     if not facts_by_entity:
         return "I don't have any personal information stored about you yet."
 
     # Format facts into a readable string
-    lines = ["Here's what I know about you:\n"]
+    buf = io.StringIO()
+    buf.write("Here's what I know about you:\n")
 
     for entity, facts in sorted(facts_by_entity.items()):
         entity_display = entity.replace("_", " ").title()
-        lines.append(f"\n**{entity_display}:**")
-        for fact in facts:
-            lines.append(f"  - {fact}")
+        buf.write(f"\n\n**{entity_display}:**")
+        buf.writelines(f"\n  - {fact}" for fact in facts)
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 async def retrieve_historical_info(entity: str = "") -> str:
@@ -74,7 +79,7 @@ async def retrieve_historical_info(entity: str = "") -> str:
     Returns:
         str: Formatted string of historical personal information with time periods
     """
-    print(f"Retrieving historical information (entity: {entity or 'all'})...")
+    logger.debug("Retrieving historical information (entity: %s)...", entity or "all")
     historical_facts = await get_historical_facts(entity)
 
     if not historical_facts:
@@ -83,11 +88,12 @@ async def retrieve_historical_info(entity: str = "") -> str:
         return "I don't have any historical information stored about you."
 
     # Format historical facts with temporal information
-    lines = ["Here's what I know about your past:\n"]
+    buf = io.StringIO()
+    buf.write("Here's what I know about your past:\n")
 
     for entity_name, facts in sorted(historical_facts.items()):
         entity_display = entity_name.replace("_", " ").title()
-        lines.append(f"\n**{entity_display} (Previous):**")
+        buf.write(f"\n\n**{entity_display} (Previous):**")
         for fact in facts:
             content = fact["content"]
             valid_from = fact.get("valid_from", "")
@@ -95,18 +101,15 @@ async def retrieve_historical_info(entity: str = "") -> str:
 
             # Format with time period if available
             if valid_from and valid_until:
-                lines.append(f"  - {content} (until {valid_until[:10]})")
+                buf.write(f"\n  - {content} (until {valid_until[:10]})")
             else:
-                lines.append(f"  - {content}")
+                buf.write(f"\n  - {content}")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
-root_agent = Agent(
-    name="middleware_assistant",
-    model="gemini-2.0-flash-exp",
-    description="A helpful AI assistant similar to Gemini with persistent memory",
-    instruction="""You are a helpful, harmless, and honest AI assistant with the ability to remember personal information about users across conversations.
+# System instruction for the Main Agent, kept as a module-level constant
+SYSTEM_INSTRUCTION = """You are a helpful, harmless, and honest AI assistant with the ability to remember personal information about users across conversations.
 
 Your key traits:
 - Provide clear, accurate, and helpful responses to user queries
@@ -188,10 +191,11 @@ Call this tool when the user asks about PAST/PREVIOUS information:
 - Any question with temporal indicators: before, previously, used to, old, former, past
 
 **How to use retrieve_historical_info:**
-- If the question mentions a specific entity (location, hobbies, profession), pass that entity name
-  Example: "Where did I live before?" → retrieve_historical_info("location")
+- If the question mentions a specific entity, pass that entity name. Entity names are:
+  name, age, location, profession, occupation, hobbies, interests, preferences, family,
+  education, goals, aspirations, health, pets, relationships, skills, languages,
+  dietary_preferences, and other.
 - If the question is general about the past, don't pass an entity
-  Example: "What did I do before?" → retrieve_historical_info()
 
 **Temporal Query Examples:**
 - User: "Where did I live before?"
@@ -214,16 +218,13 @@ Call this tool when the user asks about PAST/PREVIOUS information:
 5. If memory operations fail, continue the conversation normally
 6. The memory system works across all conversations - information persists
 
-**Standard entity categories** (for your awareness):
-The system organizes personal information into these categories:
-name, age, location, profession, occupation, hobbies, interests, preferences, family,
-education, goals, aspirations, health, pets, relationships, skills, languages,
-dietary_preferences, and other.
-
-You don't need to categorize - the system does this automatically. Just pass the
-user's message to store_personal_info.
-
 Always strive to be helpful, remember what users tell you, and use that context to
-provide more personalized and relevant assistance.""",
+provide more personalized and relevant assistance."""
+
+root_agent = Agent(
+    name="middleware_assistant",
+    model="gemini-2.0-flash-exp",
+    description="A helpful AI assistant similar to Gemini with persistent memory",
+    instruction=SYSTEM_INSTRUCTION,
     tools=[store_personal_info, retrieve_personal_info, retrieve_historical_info],
 )
@@ -2,23 +2,31 @@
 Memory Agent module for processing and managing user personal information.
 
 This module provides the Memory Agent functionality that:
-1. Extracts ALL entities from user messages
-2. For each entity, fetches current facts
-3. Resolves new facts using LLM
-4. Saves updated facts using diff-based logic
+1. Fetches current facts for all entities
+2. Extracts ALL entities from user messages and resolves their new facts
+   against the current facts in a single LLM call
+3. Saves updated facts using diff-based logic
 
 The Memory Agent operates independently from the Main Agent and handles
 all memory operations, failing silently to avoid disrupting conversations.
 """
 
-import json
+import asyncio
+import logging
+import re
+import time
+import weakref
 from datetime import datetime, timezone
-from typing import Optional
 
+import msgspec
+import orjson
+from context import get_current_user_id
 from google.genai import Client
-from google.genai.types import GenerateContentConfig
+from google.genai.types import FinishReason, GenerateContentConfig, Schema, Type
 
-from .tools import get_entity_facts, save_entity_facts_diff
+from .tools import get_entities_facts, save_entity_facts_diff
+
+logger = logging.getLogger(__name__)
 
 # Hardcoded list of allowed entity types for consistent naming
 ALLOWED_ENTITIES = [
@@ -42,32 +50,60 @@ ALLOWED_ENTITIES = [
     "dietary_preferences",
     "other",
 ]
-
-# Initialize Gemini client
-client = Client()
-
-
-async def extract_all_entities(user_message: str) -> dict[str, list[str]]:
-    """
-    Extract ALL entities and their facts from a user message.
-
-    This function uses an LLM to identify all personal information in the message
-    and organize it by entity type.
-
-    Args:
-        user_message: The user's message to analyze
-
-    Returns:
-        dict[str, list[str]]: Dictionary mapping entity names to lists of facts
-                              Example: {"name": ["Alex"], "location": ["San Francisco"]}
-    """
-    try:
-        entities_list = ", ".join(ALLOWED_ENTITIES)
-        prompt = f"""Extract ALL personal information from the user's message and organize it by entity type.
-
-Allowed entity types: {entities_list}
-
-User message: "{user_message}"
+_ALLOWED_ENTITIES_SET = frozenset(ALLOWED_ENTITIES)
+_ALLOWED_ENTITIES_STR = ", ".join(ALLOWED_ENTITIES)
+
+# Cheap pre-check for personal information. The Main Agent has already judged
+# the message personal, so this only skips messages with no signal at all:
+# first-person references, fact phrases ("years old", "moved to", "work at"),
+# any number (ages, years, counts) or, outside questions, a capitalized word
+# after the first one (names, places, employers).
+_PERSONAL_INFO_RE = re.compile(
+    r"\b(i|my|mine|myself|we|our|ours|call me|years old"
+    r"|live[sd]? in|living in|moved to|born in|work(s|ed|ing)? (at|as|for|in)"
+    r"|love[sd]?|enjoy(s|ed)?|prefer(s|red)?|hate[sd]?)\b|\d",
+    re.IGNORECASE,
+)
+_PROPER_NOUN_RE = re.compile(r"(?<=\s)[A-Z][a-z]")
+# Short replies such as "Sarah" or "Leeds" pass when capitalized, unless
+# they're small talk
+_SHORT_REPLY_MAX_WORDS = 3
+_SMALL_TALK_WORDS = frozenset(
+    "thanks thank ok okay cool yes no sure hi hello hey bye great nice".split()
+)
+
+
+def _has_personal_info_signal(user_message: str) -> bool:
+    """Check whether a message could contain personal information."""
+    if _PERSONAL_INFO_RE.search(user_message):
+        return True
+    # Questions without a first-person or numeric signal ask about the world
+    if user_message.rstrip().endswith("?"):
+        return False
+    if _PROPER_NOUN_RE.search(user_message):
+        return True
+    words = user_message.split()
+    return (
+        0 < len(words) <= _SHORT_REPLY_MAX_WORDS
+        and words[0][0].isupper()
+        and words[0].strip(".,!").lower() not in _SMALL_TALK_WORDS
+    )
+
+
+# Structured output schema: one array of fact strings per allowed entity
+EXTRACT_RESPONSE_SCHEMA = Schema(
+    type=Type.OBJECT,
+    properties={
+        entity: Schema(type=Type.ARRAY, items=Schema(type=Type.STRING))
+        for entity in ALLOWED_ENTITIES
+    },
+)
+
+# Static extraction instructions, sent as the system instruction so every call
+# shares an identical prefix and only the facts and message vary per call
+EXTRACT_SYSTEM_INSTRUCTION = f"""Extract ALL personal information from the user's message, organize it by entity type, and merge it with the facts already stored about the user.
+
+Allowed entity types: {_ALLOWED_ENTITIES_STR}
 
 Instructions:
 1. Identify ALL pieces of personal information in the message
@@ -84,179 +120,374 @@ Instructions:
    - Use 'goals' for aspirations, future plans
    - Use other entity types as appropriate
 
-3. For each entity, extract ONLY the facts relevant to that entity
-4. Keep facts concise and clear
-5. If no personal information is found, return an empty object
+3. For each entity mentioned in the message, generate the complete, updated list of facts:
+   - If new facts contradict current facts, USE THE NEW FACTS (they are more recent)
+   - If new facts add information, ADD them to the current facts
+   - If new facts repeat existing information, KEEP the existing facts exactly as stored (don't duplicate)
+4. Only include entities mentioned in the message; leave out all other entities
+5. Keep facts concise and clear
+6. If no personal information is found, return an empty object
 
-Respond with a JSON object where keys are entity names and values are arrays of facts.
+Respond with a JSON object where keys are entity names and values are the final arrays of facts.
 
 Examples:
 
+Current: {{}}
 Input: "Hi, I'm Alex and I'm a software engineer from San Francisco"
 Output: {{"name": ["Alex"], "profession": ["software engineer"], "location": ["San Francisco"]}}
 
-Input: "I'm 28 years old and I love hiking and photography"
+Current: {{"hobbies": ["hiking"]}}
+Input: "I'm 28 years old and I love photography"
 Output: {{"age": ["28 years old"], "hobbies": ["hiking", "photography"]}}
 
-Input: "I work as a teacher in Boston and I'm learning Spanish"
-Output: {{"profession": ["teacher"], "location": ["Boston"], "languages": ["learning Spanish"]}}
+Current: {{"location": ["Boston"], "profession": ["teacher"]}}
+Input: "I just moved to New York"
+Output: {{"location": ["New York"]}}
 
+Current: {{"name": ["Alex"]}}
 Input: "How's the weather?"
-Output: {{}}
+Output: {{}}"""
+
+# Output is a small JSON object, typically well under 200 tokens; responses
+# that hit the budget are retried once with double the budget
+EXTRACT_CONFIG = GenerateContentConfig(
+    temperature=0.2,
+    max_output_tokens=256,
+    response_mime_type="application/json",
+    response_schema=EXTRACT_RESPONSE_SCHEMA,
+    system_instruction=EXTRACT_SYSTEM_INSTRUCTION,
+)
+
+# Typed shape of the extraction response, decoded and validated by msgspec
+_ExtractSchema = dict[str, list[str]]
+
+# In-process TTL cache of active facts, keyed by (user_id, entity)
+FACTS_CACHE_TTL_SECONDS = 60
+FACTS_CACHE_MAX_ENTRIES = 10000
+_facts_cache: dict[tuple[str, str], tuple[float, list[str]]] = {}
+
+# Per-user locks serializing fetch -> extract -> save; entries disappear once
+# no update for that user holds the lock
+_user_locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
 
-Respond ONLY with valid JSON. No explanation, no markdown, just the JSON object.
+# Initialize Gemini client
+client = Client()
 
-Response:"""
 
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.2,
-                max_output_tokens=1000,
-            ),
-        )
+def _user_lock(user_id: str) -> asyncio.Lock:
+    """Get the lock serializing memory updates for a user."""
+    lock = _user_locks.get(user_id)
+    if lock is None:
+        lock = _user_locks[user_id] = asyncio.Lock()
+    return lock
 
-        # Parse JSON response
-        response_text = response.text.strip()
 
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            # Remove first and last lines (```)
-            response_text = "\n".join(
-                line for line in lines if not line.startswith("```")
-            )
-            response_text = response_text.strip()
+def _invalidate_cached_facts(user_id: str, entity: str) -> None:
+    """Drop an entity's cached facts after they were saved."""
+    _facts_cache.pop((user_id, entity), None)
 
-        # Remove "json" prefix if present
-        if response_text.startswith("json"):
-            response_text = response_text[4:].strip()
 
-        entities_dict = json.loads(response_text)
+async def get_entities_facts_cached(entities: list[str]) -> dict[str, list[str]]:
+    """
+    Retrieve active facts for several entities, served from the TTL cache when warm.
 
-        if not isinstance(entities_dict, dict):
-            print(f"LLM returned non-dict response: {entities_dict}")
-            return {}
+    Entities missing from the cache are fetched together in a single query.
+    Entries are invalidated whenever the entity's facts are saved by this
+    module, so a cached list is never older than the last update made here.
+    Must be called under the user's lock.
 
-        # Validate all entity names are in allowed list
-        validated_dict = {}
-        for entity, facts in entities_dict.items():
-            if entity.lower() in ALLOWED_ENTITIES:
-                # Ensure facts is a list of strings
-                if isinstance(facts, list):
-                    validated_dict[entity.lower()] = [str(f) for f in facts if f]
+    Args:
+        entities: The entity names (e.g., ["profession", "hobbies"])
 
-        return validated_dict
+    Returns:
+        dict[str, list[str]]: Dictionary mapping each entity to its facts
 
-    except json.JSONDecodeError as e:
-        print(f"Error parsing LLM JSON response for entity extraction: {e}")
-        print(f"Response was: {response.text}")
-        return {}
-    except Exception as e:
-        print(f"Error extracting entities: {e}")
-        return {}
+    Raises:
+        Exception: If the facts can't be read; failed reads are never cached
+    """
+    user_id = get_current_user_id()
+    now = time.monotonic()
+
+    facts_by_entity: dict[str, list[str]] = {}
+    missing: list[str] = []
+    for entity in entities:
+        cached = _facts_cache.get((user_id, entity))
+        if cached and now - cached[0] < FACTS_CACHE_TTL_SECONDS:
+            facts_by_entity[entity] = cached[1]
+        else:
+            missing.append(entity)
+
+    if missing:
+        # Callers hold the user's lock, so no save for this user can land
+        # between this fetch and the cache fill
+        fetched = await get_entities_facts(missing)
+        facts_by_entity.update(fetched)
+
+        # Drop everything rather than tracking LRU order; misses are cheap
+        if len(_facts_cache) + len(fetched) > FACTS_CACHE_MAX_ENTRIES:
+            _facts_cache.clear()
+        now = time.monotonic()
+        for entity, facts in fetched.items():
+            _facts_cache[(user_id, entity)] = (now, facts)
+
+    return facts_by_entity
 
 
-async def resolve_facts_with_llm(
-    entity: str, current_facts: list[str], new_facts: list[str]
-) -> list[str]:
+async def extract_and_resolve(
+    user_message: str, current_facts_by_entity: dict[str, list[str]]
+) -> dict[str, list[str]]:
     """
-    Resolve the new state of facts for an entity using LLM.
+    Extract ALL entities from a user message and resolve their final facts.
 
-    Given current facts and new facts from a message, the LLM determines:
-    - Which facts to keep (still true)
-    - Which facts to update (changed)
-    - Which facts to add (new information)
-    - Which facts to remove (no longer true)
+    A single LLM call both categorizes the personal information in the message
+    and merges it against the user's current facts, so only the entities the
+    message mentions are returned, each with its complete updated list of facts.
 
     Args:
-        entity: The entity name (e.g., "profession", "hobbies")
-        current_facts: List of current active facts for this entity
-        new_facts: List of new facts extracted from the message
+        user_message: The user's message to analyze
+        current_facts_by_entity: Current active facts keyed by entity name
 
     Returns:
-        list[str]: Complete new list of facts for this entity
+        dict[str, list[str]]: Dictionary mapping entity names to final lists of facts
+                              Example: {"name": ["Alex"], "location": ["San Francisco"]}
     """
     try:
-        # If no current facts, just return the new facts
-        if not current_facts:
-            return new_facts
-
-        # If no new facts, keep current facts
-        if not new_facts:
-            return current_facts
-
-        current_facts_str = json.dumps(current_facts)
-        new_facts_str = json.dumps(new_facts)
+        current_facts_str = orjson.dumps(
+            _non_empty_facts(current_facts_by_entity)
+        ).decode()
+        prompt = f"""Current stored facts:
+{current_facts_str}
 
-        prompt = f"""You are merging facts about a user's {entity}.
+User message: "{user_message}"
 
-Current stored facts:
-{current_facts_str}
+Response:"""
 
-New facts from latest message:
-{new_facts_str}
+        response = await _generate_json(prompt, EXTRACT_CONFIG)
 
-Your task:
-Generate the complete, updated list of facts for this entity.
+        # Parses and validates in one pass; the OBJECT response schema makes
+        # the lenient fallback a rare path
+        entities_dict = _decode(response.text, _ExtractSchema, _coerce_entities)
+        return _validate_entities(entities_dict)
 
-Instructions:
-- If new facts contradict current facts, USE THE NEW FACTS (they are more recent)
-- If new facts add information, ADD them to the list
-- If new facts repeat existing information, KEEP the existing facts (don't duplicate)
-- Each fact should be a clear, concise statement
-- Only include facts relevant to '{entity}'
+    except msgspec.DecodeError as e:
+        logger.warning(
+            "Error parsing LLM JSON response for entity extraction: %s (response was: %s)",
+            e,
+            response.text,
+        )
+        return {}
+    except Exception as e:
+        logger.warning("Error extracting entities: %s", e)
+        return {}
 
-Examples:
-- Current: ["Lives in Boston"], New: ["Lives in New York"] → ["Lives in New York"]
-- Current: ["Software engineer"], New: ["Senior software engineer"] → ["Senior software engineer"]
-- Current: ["Hiking"], New: ["Photography"] → ["Hiking", "Photography"]
-- Current: ["Alex"], New: ["Alex"] → ["Alex"]
 
-Respond ONLY with a JSON array of strings representing the final facts.
-Example: ["fact1", "fact2", "fact3"]
+async def _generate_json(prompt: str, config: GenerateContentConfig):
+    """
+    Generate a structured JSON response, retrying once if it was truncated.
 
-Response:"""
+    Args:
+        prompt: The per-call prompt contents
+        config: Generation config carrying the output budget and schema
 
-        response = client.models.generate_content(
+    Returns:
+        GenerateContentResponse: The model response
+    """
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash-exp",
+        contents=prompt,
+        config=config,
+    )
+
+    if (
+        response.candidates
+        and response.candidates[0].finish_reason == FinishReason.MAX_TOKENS
+    ):
+        logger.debug(
+            "Response hit max_output_tokens=%d, retrying with double the budget",
+            config.max_output_tokens,
+        )
+        response = await client.aio.models.generate_content(
             model="gemini-2.0-flash-exp",
             contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.2,
-                max_output_tokens=500,
+            config=config.model_copy(
+                update={"max_output_tokens": config.max_output_tokens * 2}
             ),
         )
 
-        # Parse JSON response
-        response_text = response.text.strip()
+    return response
 
-        # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(
-                line for line in lines if not line.startswith("```")
-            )
-            response_text = response_text.strip()
 
-        facts = json.loads(response_text)
+def _non_empty_facts(
+    current_facts_by_entity: dict[str, list[str]],
+) -> dict[str, list[str]]:
+    """Drop entities without facts so they don't bloat the prompt."""
+    return {entity: facts for entity, facts in current_facts_by_entity.items() if facts}
 
-        if not isinstance(facts, list):
-            print(f"LLM returned non-list response: {facts}")
-            return current_facts
 
-        # Ensure all facts are strings
-        facts = [str(f) for f in facts if f]
+def _decode(raw: str, tp, coerce):
+    """
+    Decode JSON and validate it against tp in a single pass.
 
-        return facts if facts else current_facts
+    Args:
+        raw: The JSON text returned by the model
+        tp: The msgspec type to decode into
+        coerce: Fallback that converts loosely-shaped JSON into tp's shape
 
-    except json.JSONDecodeError as e:
-        print(f"Error parsing LLM JSON response: {e}")
-        print(f"Response was: {response.text}")
-        return current_facts
-    except Exception as e:
-        print(f"Error resolving facts with LLM: {e}")
-        return current_facts
+    Returns:
+        The decoded value, or the coerced value if validation failed
+    """
+    try:
+        return msgspec.json.decode(raw, type=tp)
+    except msgspec.ValidationError:
+        # Well-formed JSON with an unexpected shape: take the lenient path
+        return coerce(msgspec.json.decode(raw))
+
+
+def _coerce_entities(obj) -> dict[str, list[str]]:
+    """Lenient fallback: keep entity keys whose value is a list of facts."""
+    if not isinstance(obj, dict):
+        return {}
+    return {
+        str(entity): [str(f) for f in facts if f]
+        for entity, facts in obj.items()
+        if isinstance(facts, list)
+    }
+
+
+def _validate_entities(entities_dict: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Keep only allowed entity names with a non-empty list of facts."""
+    validated_dict = {}
+    for entity, facts in entities_dict.items():
+        key = entity.lower()
+        if key in _ALLOWED_ENTITIES_SET:
+            facts = [f for f in facts if f]
+            if facts:
+                validated_dict[key] = facts
+    return validated_dict
+
+
+def _facts_unchanged(current_facts: list[str], resolved_facts: list[str]) -> bool:
+    """Check whether resolved facts only repeat the current ones."""
+    current_norm = {f.strip().lower() for f in current_facts}
+    resolved_norm = {f.strip().lower() for f in resolved_facts}
+    return resolved_norm == current_norm
+
+
+async def _process_entity(
+    entity: str,
+    current_facts: list[str],
+    resolved_facts: list[str],
+    source_text: str,
+    source_timestamp: datetime,
+) -> str:
+    """
+    Save the resolved facts for a single entity.
+
+    Args:
+        entity: The entity name (e.g., "profession", "hobbies")
+        current_facts: List of current active facts for this entity
+        resolved_facts: Complete new list of facts for this entity
+        source_text: The original user message that generated these facts
+        source_timestamp: Timestamp of the source message
+
+    Returns:
+        str: Result message from the save
+    """
+    logger.debug(
+        "🔹 Processing entity: %s (current facts in DB: %s, resolved final facts: %s)",
+        entity,
+        current_facts,
+        resolved_facts,
+    )
+
+    # Save diff to database
+    result = await save_entity_facts_diff(
+        entity=entity,
+        current_facts=current_facts,
+        new_facts=resolved_facts,
+        source_text=source_text,
+        source_timestamp=source_timestamp,
+    )
+    _invalidate_cached_facts(get_current_user_id(), entity)
+    logger.debug("✅ %s", result)
+    return result
+
+
+async def _apply_memory_update(user_message: str, timestamp: datetime) -> str:
+    """
+    Fetch current facts, resolve the message against them and save the diffs.
+
+    Must run under the user's lock so no other update for the same user
+    reads or writes facts in between.
+
+    Args:
+        user_message: The user's message containing personal information
+        timestamp: Timestamp of the source message
+
+    Returns:
+        str: Confirmation message
+    """
+    # Step 1: Fetch current facts for every entity in one query
+    current_facts_by_entity = await get_entities_facts_cached(ALLOWED_ENTITIES)
+
+    # Step 2: Extract and resolve ALL entities from the message
+    resolved_by_entity = await extract_and_resolve(
+        user_message, current_facts_by_entity
+    )
+
+    if not resolved_by_entity:
+        logger.debug("No entities detected in message: %s", user_message)
+        return "Information noted."
+
+    logger.debug("📊 Resolved entities: %s", resolved_by_entity.keys())
+
+    # Skip entities the message only repeated; saving them is a no-op
+    resolved_by_entity = {
+        entity: resolved_facts
+        for entity, resolved_facts in resolved_by_entity.items()
+        if not _facts_unchanged(current_facts_by_entity[entity], resolved_facts)
+    }
+
+    if not resolved_by_entity:
+        logger.debug("All resolved facts are already stored")
+        return "Information noted."
+
+    # Step 3: Save each entity's diff concurrently; one failure doesn't
+    # cancel the others
+    results = await asyncio.gather(
+        *(
+            _process_entity(
+                entity,
+                current_facts_by_entity[entity],
+                resolved_facts,
+                user_message,
+                timestamp,
+            )
+            for entity, resolved_facts in resolved_by_entity.items()
+        ),
+        return_exceptions=True,
+    )
+
+    processed_count = 0
+    for entity, result in zip(resolved_by_entity, results):
+        if isinstance(result, Exception):
+            # Log error but keep the other entities' results
+            logger.warning("❌ Error processing entity '%s': %s", entity, result)
+        else:
+            processed_count += 1
+
+    if processed_count > 0:
+        logger.debug(
+            "✅ Successfully processed %d/%d entities",
+            processed_count,
+            len(resolved_by_entity),
+        )
+        return (
+            f"Information stored successfully ({processed_count} categories updated)."
+        )
+    else:
+        logger.debug("⚠️  No entities were successfully processed")
+        return "Information noted."
 
 
 async def process_memory_update(user_message: str) -> str:
@@ -265,11 +496,9 @@ async def process_memory_update(user_message: str) -> str:
 
     This is the main function called by the Main Agent's store_personal_info tool.
     It orchestrates the entire memory update flow:
-    1. Extract ALL entities and their facts from the message
-    2. For each entity:
-       a. Fetch current active facts
-       b. Resolve new state with LLM
-       c. Save the diff to the database
+    1. Fetch current active facts for all entities
+    2. Extract and resolve ALL entities from the message with one LLM call
+    3. Save the diff for each resolved entity to the database concurrently
 
     The function fails silently on errors to avoid disrupting user conversation.
 
@@ -280,63 +509,26 @@ async def process_memory_update(user_message: str) -> str:
         str: Confirmation message (generic on error to fail silently)
     """
     try:
-        # Step 1: Extract ALL entities from the message
-        print(f"\n🔍 Processing message: {user_message[:100]}...")
-        entities_with_facts = await extract_all_entities(user_message)
+        logger.debug("🔍 Processing message: %.100s...", user_message)
 
-        if not entities_with_facts:
-            print(f"No entities detected in message: {user_message}")
+        if not _has_personal_info_signal(user_message):
+            logger.debug("No personal information signals in message: %s", user_message)
             return "Information noted."
 
-        print(f"📊 Extracted entities: {list(entities_with_facts.keys())}")
-
+        # Captured once, before the LLM call, and shared by every entity's save
         timestamp = datetime.now(timezone.utc)
-        processed_count = 0
-
-        # Step 2: Process each entity separately
-        for entity, new_facts in entities_with_facts.items():
-            try:
-                print(f"\n  🔹 Processing entity: {entity}")
-                print(f"     New facts from message: {new_facts}")
-
-                # Fetch current facts for this entity
-                current_facts = await get_entity_facts(entity)
-                print(f"     Current facts in DB: {current_facts}")
-
-                # Resolve the final state
-                resolved_facts = await resolve_facts_with_llm(
-                    entity, current_facts, new_facts
-                )
-                print(f"     Resolved final facts: {resolved_facts}")
-
-                # Save diff to database
-                result = await save_entity_facts_diff(
-                    entity=entity,
-                    new_facts=resolved_facts,
-                    source_text=user_message,
-                    source_timestamp=timestamp,
-                )
-                print(f"✅ {result}")
-                processed_count += 1
-
-            except Exception as e:
-                # Log error but continue with other entities
-                print(f"     ❌ Error processing entity '{entity}': {e}")
-                continue
-
-        if processed_count > 0:
-            print(
-                f"\n✅ Successfully processed {processed_count}/{len(entities_with_facts)} entities"
-            )
-            return f"Information stored successfully ({processed_count} categories updated)."
-        else:
-            print(f"\n⚠️  No entities were successfully processed")
-            return "Information noted."
+
+        # Serialize updates per user so each one resolves against the facts
+        # the previous one saved
+        async with _user_lock(get_current_user_id()):
+            return await _apply_memory_update(user_message, timestamp)
 
     except Exception as e:
         # Fail silently - don't disrupt conversation
-        print(f"❌ Error in process_memory_update: {e}")
-        import traceback
-
-        traceback.print_exc()
+        # The traceback is only formatted when DEBUG logging is enabled
+        logger.warning(
+            "❌ Error in process_memory_update: %s",
+            e,
+            exc_info=logger.isEnabledFor(logging.DEBUG),
+        )
         return "Information noted."
@@ -4,15 +4,19 @@ Memory tools for retrieving and saving user personal information as temporal fac
 This module provides async tools that the agent can use to:
 - Retrieve all active facts for a user
 - Retrieve historical/invalidated facts for temporal queries
-- Retrieve facts for a specific entity
+- Retrieve facts for several entities in one query
 - Save updated facts using diff-based logic
 """
 
+import logging
 from datetime import datetime, timezone
 from typing import Optional
 
-from context import get_current_user_id
+from context import get_current_user_id, get_request_cache
 from database import get_facts_collection
+from pymongo import UpdateMany, UpdateOne
+
+logger = logging.getLogger(__name__)
 
 
 async def get_all_personal_info() -> dict[str, list[str]]:
@@ -34,23 +38,25 @@ async def get_all_personal_info() -> dict[str, list[str]]:
         user_id = get_current_user_id()
         collection = get_facts_collection()
 
-        # Query all active facts for this user
-        cursor = collection.find({"user_id": user_id, "status": "active"})
-
-        # Group facts by entity
-        facts_by_entity: dict[str, list[str]] = {}
-        async for doc in cursor:
-            entity = doc["entity"]
-            content = doc["content"]
-
-            if entity not in facts_by_entity:
-                facts_by_entity[entity] = []
-            facts_by_entity[entity].append(content)
+        cache = get_request_cache()
+        if "all" in cache:
+            return cache["all"]
+
+        # Group all active facts for this user by entity on the server
+        cursor = collection.aggregate(
+            [
+                {"$match": {"user_id": user_id, "status": "active"}},
+                {"$group": {"_id": "$entity", "contents": {"$push": "$content"}}},
+            ],
+            batchSize=500,
+        )
 
+        facts_by_entity = {doc["_id"]: doc["contents"] async for doc in cursor}
+        cache["all"] = facts_by_entity
         return facts_by_entity
 
     except Exception as e:
-        print(f"Error retrieving personal info: {e}")
+        logger.error("Error retrieving personal info: %s", e)
         return {}
 
 
@@ -91,7 +97,20 @@ async def get_historical_facts(entity: Optional[str] = None) -> dict[str, list[d
             query["entity"] = entity
 
         # Query historical facts, sorted by valid_until (most recent first)
-        cursor = collection.find(query).sort("valid_until", -1)
+        cursor = (
+            collection.find(
+                query,
+                projection={
+                    "entity": 1,
+                    "content": 1,
+                    "valid_from": 1,
+                    "valid_until": 1,
+                    "_id": 0,
+                },
+            )
+            .sort("valid_until", -1)
+            .batch_size(500)
+        )
 
         # Group facts by entity with temporal metadata
         facts_by_entity: dict[str, list[dict]] = {}
@@ -115,46 +134,53 @@ async def get_historical_facts(entity: Optional[str] = None) -> dict[str, list[d
         return facts_by_entity
 
     except Exception as e:
-        print(f"Error retrieving historical facts: {e}")
+        logger.error("Error retrieving historical facts: %s", e)
         return {}
 
 
-async def get_entity_facts(entity: str) -> list[str]:
+async def get_entities_facts(entities: list[str]) -> dict[str, list[str]]:
     """
-    Retrieve active facts for a specific entity for the current user.
+    Retrieve active facts for several entities for the current user in one query.
 
     Args:
-        entity: The entity name (e.g., "profession", "hobbies")
+        entities: The entity names (e.g., ["profession", "hobbies"])
 
     Returns:
-        list[str]: List of fact content strings for this entity
+        dict[str, list[str]]: Dictionary mapping every requested entity to its
+                              list of fact content strings (empty if none)
+
+    Raises:
+        Exception: If the query fails. Unlike the other read tools this doesn't
+                   fall back to empty results, since the Memory Agent would
+                   resolve against them and invalidate every stored fact.
 
-    This tool is used by the Memory Agent when resolving updates to
-    determine the current state of an entity before generating new facts.
+    This tool is used by the Memory Agent to load the current state of all
+    entities before resolving an update, instead of one query per entity.
     """
-    try:
-        user_id = get_current_user_id()
-        collection = get_facts_collection()
+    user_id = get_current_user_id()
+    collection = get_facts_collection()
 
-        # Query active facts for this entity
-        cursor = collection.find(
-            {"user_id": user_id, "entity": entity, "status": "active"}
-        )
+    cache = get_request_cache()
+    if "all" in cache:
+        return {entity: cache["all"].get(entity, []) for entity in entities}
 
-        # Extract content from each fact
-        facts = []
-        async for doc in cursor:
-            facts.append(doc["content"])
+    # Query active facts for all requested entities at once
+    cursor = collection.find(
+        {"user_id": user_id, "status": "active", "entity": {"$in": entities}},
+        projection={"entity": 1, "content": 1, "_id": 0},
+    ).batch_size(500)
 
-        return facts
+    # Group facts by entity client-side
+    facts_by_entity: dict[str, list[str]] = {entity: [] for entity in entities}
+    async for doc in cursor:
+        facts_by_entity[doc["entity"]].append(doc["content"])
 
-    except Exception as e:
-        print(f"Error retrieving facts for entity '{entity}': {e}")
-        return []
+    return facts_by_entity
 
 
 async def save_entity_facts_diff(
     entity: str,
+    current_facts: list[str],
     new_facts: list[str],
     source_text: str,
     source_timestamp: Optional[datetime] = None,
@@ -162,15 +188,16 @@ async def save_entity_facts_diff(
     """
     Save updated facts for an entity using diff-based logic.
 
-    This function performs a differential update:
-    1. Fetches current active facts for the entity
-    2. Computes intersection (unchanged), removed, and new facts
-    3. Preserves unchanged facts (keeps original valid_from)
-    4. Invalidates removed facts (sets status='historical', valid_until=now)
-    5. Inserts new facts (sets status='active', valid_from=now)
+    This function performs a differential update in a single bulk write:
+    1. Invalidates removed facts (sets status='historical', valid_until=now)
+       among current_facts only, so facts written after they were read
+       (e.g. by another worker) are never invalidated unseen
+    2. Preserves unchanged facts (keeps original valid_from)
+    3. Inserts new facts (sets status='active', valid_from=now)
 
     Args:
         entity: The entity name (e.g., "profession", "hobbies")
+        current_facts: The active facts the new facts were resolved against
         new_facts: List of new fact content strings
         source_text: The original user message that generated these facts
         source_timestamp: Timestamp of the source message (defaults to now)
@@ -187,64 +214,56 @@ async def save_entity_facts_diff(
         now = datetime.now(timezone.utc)
         source_ts = source_timestamp or now
 
-        # Fetch current active facts
-        current_facts_docs = []
-        cursor = collection.find(
-            {"user_id": user_id, "entity": entity, "status": "active"}
-        )
-        async for doc in cursor:
-            current_facts_docs.append(doc)
-
-        # Extract content for comparison
-        current_facts_content = {doc["content"]: doc for doc in current_facts_docs}
-        new_facts_set = set(new_facts)
-        current_facts_set = set(current_facts_content.keys())
-
-        # Compute diff
-        unchanged = current_facts_set & new_facts_set  # Intersection
-        removed = current_facts_set - new_facts_set  # In old but not new
-        added = new_facts_set - current_facts_set  # In new but not old
-
-        # Track operations for logging
-        operations = {
-            "preserved": len(unchanged),
-            "invalidated": len(removed),
-            "inserted": len(added),
-        }
+        active_filter = {"user_id": user_id, "entity": entity, "status": "active"}
+        new_facts_set = frozenset(new_facts)
 
-        # 1. Unchanged facts: Do nothing (preserve original valid_from)
-        # (No operation needed - they stay as-is in the database)
+        removed_facts = list(frozenset(current_facts) - new_facts_set)
 
-        # 2. Removed facts: Invalidate by setting status='historical' and valid_until
-        if removed:
-            for fact_content in removed:
-                doc = current_facts_content[fact_content]
-                await collection.update_one(
-                    {"_id": doc["_id"]},
+        # The diff is applied by the server in one ordered bulk write
+        requests = []
+        # 1. Removed facts: Invalidate the facts that were resolved away
+        if removed_facts:
+            requests.append(
+                UpdateMany(
+                    {**active_filter, "content": {"$in": removed_facts}},
                     {"$set": {"status": "historical", "valid_until": now}},
                 )
+            )
 
-        # 3. New facts: Insert with status='active' and valid_from=now
-        if added:
-            new_docs = []
-            for fact_content in added:
-                new_docs.append(
+        # 2. Unchanged facts: Matched by the upsert filter and left as-is
+        #    (preserves original valid_from)
+        # 3. New facts: Upserted with status='active' and valid_from=now
+        for fact_content in new_facts_set:
+            requests.append(
+                UpdateOne(
+                    {**active_filter, "content": fact_content},
                     {
-                        "user_id": user_id,
-                        "entity": entity,
-                        "content": fact_content,
-                        "status": "active",
-                        "valid_from": now,
-                        "valid_until": None,
-                        "source": {"text": source_text, "timestamp": source_ts},
-                    }
+                        "$setOnInsert": {
+                            "valid_from": now,
+                            "valid_until": None,
+                            "source": {"text": source_text, "timestamp": source_ts},
+                        }
+                    },
+                    upsert=True,
                 )
+            )
+
+        result = await collection.bulk_write(requests)
+
+        # Track operations for logging
+        operations = {
+            "preserved": len(new_facts_set) - result.upserted_count,
+            "invalidated": result.modified_count,
+            "inserted": result.upserted_count,
+        }
 
-            await collection.insert_many(new_docs)
+        # Invalidate this request's cached reads of the entity
+        cache = get_request_cache()
+        cache.pop("all", None)
 
-        print(f"Saved facts for entity '{entity}': {operations}")
+        logger.debug("Saved facts for entity '%s': %s", entity, operations)
         return f"Successfully updated {entity}: preserved {operations['preserved']}, invalidated {operations['invalidated']}, added {operations['inserted']} facts."
 
     except Exception as e:
-        print(f"Error saving facts for entity '{entity}': {e}")
+        logger.error("Error saving facts for entity '%s': %s", entity, e)
         return f"Error saving facts: {str(e)}"
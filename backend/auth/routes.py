@@ -1,6 +1,6 @@
-from database import User, get_db
+import asyncpg
+from database import User, get_pg_pool
 from fastapi import APIRouter, Depends, HTTPException, status
-from supabase import Client
 
 from .dependencies import get_current_user
 from .models import Token, UserCreate, UserLogin, UserResponse
@@ -12,57 +12,56 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 @router.post(
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-async def register(user_data: UserCreate, db: Client = Depends(get_db)):
+async def register(user_data: UserCreate, pool: asyncpg.Pool = Depends(get_pg_pool)):
     """Register a new user"""
-    # Check if user already exists
-    response = (
-        db.table("users").select("*").eq("username", user_data.username).execute()
-    )
-    if response.data:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
-        )
-
     # Create new user object to generate ID and hash password
     hashed_password = get_password_hash(user_data.password)
     new_user_obj = User(username=user_data.username, hashed_password=hashed_password)
 
-    user_dict = {
+    # Insert unless the username is taken, in a single statement;
+    # returns no row when it already exists
+    async with pool.acquire() as conn:
+        inserted_id = await conn.fetchval(
+            "INSERT INTO users (id, username, hashed_password, created_at) "
+            "VALUES ($1, $2, $3, $4) "
+            "ON CONFLICT (username) DO NOTHING RETURNING id",
+            new_user_obj.id,
+            new_user_obj.username,
+            new_user_obj.hashed_password,
+            new_user_obj.created_at,
+        )
+
+    if inserted_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
+        )
+
+    return {
         "id": new_user_obj.id,
         "username": new_user_obj.username,
         "hashed_password": new_user_obj.hashed_password,
         "created_at": new_user_obj.created_at.isoformat(),
     }
 
-    # Insert into Supabase
-    insert_response = db.table("users").insert(user_dict).execute()
-
-    if not insert_response.data:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create user",
-        )
-
-    return user_dict
-
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Client = Depends(get_db)):
+async def login(user_data: UserLogin, pool: asyncpg.Pool = Depends(get_pg_pool)):
     """Login and get access token"""
     # Find user by username
-    response = (
-        db.table("users").select("*").eq("username", user_data.username).execute()
-    )
+    # Released before the password check so bcrypt doesn't hold a connection
+    async with pool.acquire() as conn:
+        user_data_db = await conn.fetchrow(
+            "SELECT id, username, hashed_password FROM users WHERE username = $1",
+            user_data.username,
+        )
 
-    if not response.data:
+    if user_data_db is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_data_db = response.data[0]
-
     # Verify password
     if not verify_password(user_data.password, user_data_db["hashed_password"]):
         raise HTTPException(
@@ -72,7 +71,7 @@ async def login(user_data: UserLogin, db: Client = Depends(get_db)):
         )
 
     access_token = create_access_token(
-        data={"sub": user_data_db["id"], "username": user_data_db["username"]}
+        data={"sub": str(user_data_db["id"]), "username": user_data_db["username"]}
     )
 
     return Token(access_token=access_token)
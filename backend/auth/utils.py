@@ -1,5 +1,7 @@
 import os
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import bcrypt
 from jose import JWTError, jwt
@@ -33,10 +35,22 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> dict | None:
-    """Decode a JWT access token"""
+@lru_cache(maxsize=4096)
+def _decode_cached(token: str) -> dict | None:
+    """Verify and decode a JWT once per distinct token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+
+def decode_access_token(token: str) -> dict | None:
+    """Decode a JWT access token"""
+    payload = _decode_cached(token)
+    if payload is None:
+        return None
+    # Cached payloads outlive the decode, so re-check expiry on every hit
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        return None
+    return payload
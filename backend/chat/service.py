@@ -1,41 +1,47 @@
-import json
+import logging
 from typing import AsyncGenerator
 
+import orjson
 from agent import root_agent
-from context import clear_current_user_id, set_current_user_id
-from database import db
+from context import reset_current_user_id, set_current_user_id
 from google.adk.runners import Runner
 from google.genai import types
 
 from .supabase_session import SupabaseSessionService
 
+logger = logging.getLogger(__name__)
+
 APP_NAME = "middleware-ai-chat"
 
+# Pre-encoded SSE framing so the per-token path only serializes the payload
+_SSE_END = b"\n\n"
+_DELTA_PREFIX = b"event: delta\ndata: "
+_SSE_DONE = b"event: done\ndata: {}" + _SSE_END
+
+
+def _sse_delta(text: str) -> bytes:
+    """Format a streamed text chunk as an SSE delta event"""
+    return _DELTA_PREFIX + orjson.dumps({"content": text}) + _SSE_END
+
 
 class ChatService:
     """Service for managing chat sessions and streaming responses"""
 
     def __init__(self):
-        self.session_service = SupabaseSessionService(client=db)
+        self.session_service = SupabaseSessionService()
         self.runner = Runner(
             agent=root_agent, app_name=APP_NAME, session_service=self.session_service
         )
 
-    def _format_sse(self, event: str, data: dict) -> str:
+    def _format_sse(self, event: str, data: dict) -> bytes:
         """Format data as SSE event"""
-        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return b"event: %b\ndata: %b\n\n" % (event.encode(), orjson.dumps(data))
 
     async def get_user_conversations(self, user_id: str) -> list[dict]:
-        result = await self.session_service.list_sessions(
+        summaries = await self.session_service.list_session_summaries(
             app_name=APP_NAME, user_id=user_id
         )
-        conversations_list = []
-        for session in result.sessions:
-            title = (
-                session.state.get("title", "New Chat") if session.state else "New Chat"
-            )
-            conversations_list.append({"id": session.id, "title": title})
-        return conversations_list
+        return [{"id": session_id, "title": title} for session_id, title in summaries]
 
     async def get_conversation_messages(
         self, user_id: str, conversation_id: str
@@ -52,7 +58,6 @@ class ChatService:
         messages = []
 
         # Extract messages from events
-        print(session.events)
         for event in session.events:
             if event.content and event.content.parts:
                 for part in event.content.parts:
@@ -71,10 +76,10 @@ class ChatService:
             )
             return True
         except Exception as e:
-            print(f"Error deleting conversation: {e}")
+            logger.error("Error deleting conversation: %s", e)
             return False
 
-    async def _generate_title(self, first_message: str) -> str:
+    def _generate_title(self, first_message: str) -> str:
         """Generate a short title for the conversation"""
         title = first_message.strip()
         if len(title) > 50:
@@ -84,17 +89,18 @@ class ChatService:
 
     async def stream_chat(
         self, user_id: str, conversation_id: str | None, message: str
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Stream chat response as SSE events"""
         is_new = conversation_id is None
 
         # Create session only for new conversations
         if is_new:
+            title = self._generate_title(message)
             session = await self.session_service.create_session(
                 app_name=APP_NAME,
                 user_id=user_id,
                 session_id=None,
-                state={"title": await self._generate_title(message)},
+                state={"title": title},
             )
             session_id = session.id
         else:
@@ -105,17 +111,15 @@ class ChatService:
             "session", {"conversation_id": session_id, "is_new": is_new}
         )
 
-        try:
-            # Set user context for memory operations
-            set_current_user_id(user_id)
+        # Set user context for memory operations
+        context_tokens = set_current_user_id(user_id)
 
+        try:
             # Create user message content
             user_content = types.Content(
                 role="user", parts=[types.Part.from_text(text=message)]
             )
 
-            full_response = ""
-
             # Run the agent and stream responses
             async for event in self.runner.run_async(
                 user_id=user_id,
@@ -127,26 +131,19 @@ class ChatService:
                     for part in event.content.parts:
                         if part.text and event.author != "user":
                             # Stream all text content (both partial and final)
-                            yield self._format_sse("delta", {"content": part.text})
-                            if event.partial:
-                                # For partial events, accumulate the text
-                                full_response += part.text
-                            else:
-                                # For non-partial events, use the full text
-                                full_response = part.text
+                            yield _sse_delta(part.text)
 
             # Send title for new conversations
             if is_new:
-                title = await self._generate_title(message)
                 yield self._format_sse("title", {"title": title})
 
-            yield self._format_sse("done", {})
+            yield _SSE_DONE
 
         except Exception as e:
             yield self._format_sse("error", {"message": str(e)})
         finally:
-            # Clear user context after agent run
-            clear_current_user_id()
+            # Restore the previous user context after agent run
+            reset_current_user_id(context_tokens)
 
 
 # Global instance
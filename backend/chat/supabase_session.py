@@ -1,7 +1,9 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
+import ciso8601
+from database import get_supabase
 from google.adk.events.event import Event
 from google.adk.sessions import BaseSessionService, Session
 from google.adk.sessions.base_session_service import (
@@ -15,39 +17,28 @@ def parse_postgres_timestamp(timestamp_str: str) -> float:
     """
     Parse PostgreSQL timestamp string to Unix timestamp.
     Handles timezone-aware timestamps with varying microsecond precision.
+    Timestamps without an offset are treated as UTC.
 
     Example: '2025-12-14T21:36:08.97237+00:00'
     """
-    # Split on timezone
-    if "+" in timestamp_str:
-        dt_part, tz_part = timestamp_str.rsplit("+", 1)
-        tz_offset = "+" + tz_part
-    elif timestamp_str.endswith("Z"):
-        dt_part = timestamp_str[:-1]
-        tz_offset = "+00:00"
-    else:
-        dt_part = timestamp_str
-        tz_offset = "+00:00"
-
-    # Handle microseconds - pad or truncate to exactly 6 digits
-    if "." in dt_part:
-        base_dt, microseconds = dt_part.rsplit(".", 1)
-        # Pad to 6 digits or truncate if longer
-        microseconds = microseconds[:6].ljust(6, "0")
-        dt_part = f"{base_dt}.{microseconds}"
-
-    # Reconstruct and parse
-    full_timestamp = dt_part + tz_offset
-    dt = datetime.fromisoformat(full_timestamp)
-
+    dt = ciso8601.parse_datetime(timestamp_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
     return dt.timestamp()
 
 
 class SupabaseSessionService(BaseSessionService):
     """Session service implementation using Supabase."""
 
-    def __init__(self, client: Client):
-        self.client = client
+    def __init__(self, client: Optional[Client] = None):
+        self._client = client
+
+    @property
+    def client(self) -> Client:
+        """Supabase client, resolved from the shared instance on first use."""
+        if self._client is None:
+            self._client = get_supabase()
+        return self._client
 
     async def create_session(
         self,
@@ -95,19 +86,15 @@ class SupabaseSessionService(BaseSessionService):
         config: Optional[GetSessionConfig] = None,
     ) -> Optional[Session]:
         """Retrieve a session from Supabase."""
-        query = (
-            self.client.table("sessions")
-            .select("*")
-            .eq("id", session_id)
-            .eq("app_name", app_name)
-            .eq("user_id", user_id)
-        )
-
-        response = query.execute()
+        # Session row and its ordered events in a single round trip
+        response = self.client.rpc(
+            "get_session_with_events",
+            {"p_id": session_id, "p_app": app_name, "p_user": user_id},
+        ).execute()
         if not response.data:
             return None
 
-        session_data = response.data[0]
+        session_data = response.data
 
         # Convert ISO timestamp back to Unix timestamp for Session model
         last_update_time = session_data.get("last_update_time", None)
@@ -116,28 +103,7 @@ class SupabaseSessionService(BaseSessionService):
                 session_data["last_update_time"]
             )
 
-        # Remove created_at as it's not part of the Session model
-        if "created_at" in session_data:
-            del session_data["created_at"]
-
-        # Fetch events
-        events_response = (
-            self.client.table("events")
-            .select("*")
-            .eq("session_id", session_id)
-            .order("created_at")
-            .execute()
-        )
-
-        events = []
-        for event_row in events_response.data:
-            # Assuming event_data stores the JSON of the event
-            if "event_data" in event_row:
-                event_obj = Event.model_validate(event_row["event_data"])
-                events.append(event_obj)
-
-        session_data["events"] = events
-
+        # Events arrive as raw event_data dicts and are validated with the session
         return Session.model_validate(session_data)
 
     async def list_sessions(
@@ -172,6 +138,25 @@ class SupabaseSessionService(BaseSessionService):
 
         return ListSessionsResponse(sessions=sessions)
 
+    async def list_session_summaries(
+        self, *, app_name: str, user_id: str
+    ) -> list[tuple[str, str]]:
+        """List (id, title) pairs for a user's sessions, most recent first."""
+        # Let Postgres extract the title so the full state never leaves the DB
+        response = (
+            self.client.table("sessions")
+            .select("id,title:state->>title")
+            .eq("app_name", app_name)
+            .eq("user_id", user_id)
+            .order("last_update_time", desc=True)
+            .execute()
+        )
+
+        return [
+            (row["id"], row["title"] if row["title"] is not None else "New Chat")
+            for row in response.data
+        ]
+
     async def delete_session(
         self, *, app_name: str, user_id: str, session_id: str
     ) -> None:
@@ -183,11 +168,9 @@ class SupabaseSessionService(BaseSessionService):
             .eq("app_name", app_name)
             .eq("user_id", user_id)
         )
+        # Events are removed by the ON DELETE CASCADE foreign key
         query.execute()
 
-        # Events should be deleted via cascade ideally, but we can delete them manually too
-        self.client.table("events").delete().eq("session_id", session_id).execute()
-
     async def append_event(self, session: Session, event: Event) -> Event:
         """Append an event to the session and persist it."""
         # Update in-memory session and state
@@ -199,20 +182,14 @@ class SupabaseSessionService(BaseSessionService):
         # Persist event
         event_data = event.model_dump(mode="json")
 
-        self.client.table("events").insert(
+        # Insert the event and touch the session in a single round trip
+        self.client.rpc(
+            "append_event_and_touch",
             {
-                "session_id": session.id,
-                "event_data": event_data,
-                "created_at": datetime.now().isoformat(),
-            }
+                "p_session_id": session.id,
+                "p_event_data": event_data,
+                "p_state": session.state,
+            },
         ).execute()
 
-        # Update session last_update_time and state
-        self.client.table("sessions").update(
-            {
-                "last_update_time": datetime.now().isoformat(),
-                "state": session.state,
-            }
-        ).eq("id", session.id).execute()
-
         return event
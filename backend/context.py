@@ -2,15 +2,22 @@
 Context management for tracking the current user across async operations.
 
 This module provides a ContextVar to store the current user_id, allowing
-tools and services to access user context without explicit parameter passing.
+tools and services to access user context without explicit parameter passing,
+along with a per-request cache that memory tools use to avoid repeated reads
+within a single agent run.
 """
 
-from contextvars import ContextVar
+from contextvars import ContextVar, Token
 from typing import Optional
 
 # Context variable to store the current user ID
 user_id_context: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
 
+# Context variable to store the per-request cache for the current user
+request_cache_context: ContextVar[Optional[dict]] = ContextVar(
+    "request_cache", default=None
+)
+
 
 def get_current_user_id() -> str:
     """
@@ -30,18 +37,62 @@ def get_current_user_id() -> str:
     return user_id
 
 
-def set_current_user_id(user_id: str) -> None:
+def set_current_user_id(user_id: str) -> tuple[Token, Token]:
     """
-    Set the current user ID in context.
+    Set the current user ID in context and start a fresh per-request cache.
 
     Args:
         user_id: The user ID to set in context
+
+    Returns:
+        tuple[Token, Token]: Tokens to pass to reset_current_user_id
+    """
+    return user_id_context.set(user_id), request_cache_context.set({})
+
+
+def reset_current_user_id(tokens: tuple[Token, Token]) -> None:
+    """
+    Restore the user ID and per-request cache that were set before
+    set_current_user_id, so no value outlives the request that set it.
+
+    If the caller is finalized in a different context (e.g. an async
+    generator closed by the event loop after a client disconnect), there is
+    nothing to restore and the tokens are ignored.
+
+    Args:
+        tokens: The tokens returned by set_current_user_id
     """
-    user_id_context.set(user_id)
+    user_token, cache_token = tokens
+    try:
+        request_cache_context.reset(cache_token)
+        user_id_context.reset(user_token)
+    except ValueError:
+        # Token was created in a different Context; the values it set died
+        # with that context
+        pass
 
 
 def clear_current_user_id() -> None:
     """
-    Clear the current user ID from context.
+    Clear the current user ID and the per-request cache from context.
+
+    For callers without the tokens from set_current_user_id; prefer
+    reset_current_user_id when they're available.
     """
     user_id_context.set(None)
+    request_cache_context.set(None)
+
+
+def get_request_cache() -> dict:
+    """
+    Get the per-request cache for the current user.
+
+    The cache is created by set_current_user_id, so every tool call made
+    during one agent run shares the same dict. Outside a request a fresh,
+    throwaway dict is returned so callers never need to check for None.
+
+    Returns:
+        dict: The per-request cache
+    """
+    cache = request_cache_context.get()
+    return cache if cache is not None else {}
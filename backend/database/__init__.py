@@ -1,11 +1,12 @@
-from .config import db, get_db, init_db
+from .config import close_db, get_pg_pool, get_supabase, init_db
 from .models import User
 from .mongo import close_mongo, get_facts_collection, init_mongo
 
 __all__ = [
-    "db",
-    "get_db",
+    "get_pg_pool",
+    "get_supabase",
     "init_db",
+    "close_db",
     "User",
     "get_facts_collection",
     "init_mongo",
@@ -1,23 +1,114 @@
+import logging
 import os
+from typing import Optional
 
-from dotenv import load_dotenv
-from supabase import create_client
+import asyncpg
+import httpx
+from supabase import Client, ClientOptions, create_client
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL", "")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
+# Supabase client and Postgres pool shared across requests, created at startup
+_supabase: Optional[Client] = None
+_supabase_http: Optional[httpx.Client] = None
+_pg_pool: Optional[asyncpg.Pool] = None
 
-# Initialize Supabase client
-db = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+def get_supabase() -> Client:
+    """
+    Get the Supabase client instance.
 
-def get_db():
-    """Dependency to get Supabase client"""
-    return db
+    Returns:
+        Client: The shared Supabase client
 
+    Raises:
+        RuntimeError: If the client hasn't been initialized
+    """
+    if _supabase is None:
+        raise RuntimeError(
+            "Supabase not initialized. Call init_db() during application startup."
+        )
+    return _supabase
 
-async def init_db():
-    """Initialize database (no-op for Supabase)"""
-    pass
+
+def get_pg_pool() -> asyncpg.Pool:
+    """
+    Dependency that returns the shared Postgres pool.
+
+    Handlers acquire a connection around their queries only, so slow work
+    such as password hashing doesn't hold a pooled connection.
+
+    Returns:
+        asyncpg.Pool: The shared Postgres pool
+
+    Raises:
+        RuntimeError: If the pool hasn't been initialized
+    """
+    if _pg_pool is None:
+        raise RuntimeError(
+            "Postgres pool not initialized. Call init_db() during application startup."
+        )
+    return _pg_pool
+
+
+async def init_db() -> None:
+    """
+    Initialize the Supabase client and the Postgres connection pool.
+
+    This function should be called during application startup so requests
+    reuse warm connections instead of paying a handshake each time.
+    """
+    global _supabase, _supabase_http, _pg_pool
+
+    supabase_url = os.getenv("SUPABASE_URL", "")
+    supabase_key = os.getenv("SUPABASE_KEY", "")
+    # Direct Postgres connection string for the Supabase database
+    database_url = os.getenv("DATABASE_URL", "")
+
+    # Auth can't work without the pool, so refuse to start rather than
+    # serving 500s on every login
+    if not database_url:
+        raise RuntimeError(
+            "DATABASE_URL not set in environment variables. It is required for auth."
+        )
+
+    # Bounded keep-alive pool for the Supabase REST client
+    _supabase_http = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=20, max_keepalive_connections=10, keepalive_expiry=30
+        )
+    )
+    _supabase = create_client(
+        supabase_url, supabase_key, options=ClientOptions(httpx_client=_supabase_http)
+    )
+
+    _pg_pool = await asyncpg.create_pool(
+        database_url,
+        # Kept small since every uvicorn worker opens its own pool
+        min_size=2,
+        max_size=50,
+        max_inactive_connection_lifetime=300,
+        # Supabase's transaction-mode pooler (port 6543) doesn't support
+        # prepared statements across transactions
+        statement_cache_size=0,
+    )
+    logger.info("Postgres connection pool initialized.")
+
+
+async def close_db() -> None:
+    """
+    Close the Postgres connection pool and the Supabase HTTP client.
+
+    This function should be called during application shutdown.
+    """
+    global _supabase, _supabase_http, _pg_pool
+
+    if _supabase_http:
+        _supabase_http.close()
+        _supabase_http = None
+        _supabase = None
+
+    if _pg_pool:
+        await _pg_pool.close()
+        _pg_pool = None
+        logger.info("Postgres connection pool closed.")
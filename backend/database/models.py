@@ -1,20 +1,23 @@
 import uuid
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Optional
 
+# Bound once to skip the module attribute lookup on every new user
+_UUID4 = uuid.uuid4
 
+
+def _now() -> datetime:
+    """Current time as an aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
+@dataclass(slots=True)
 class User:
-    def __init__(
-        self,
-        username: str,
-        hashed_password: str,
-        id: Optional[str] = None,
-        created_at: Optional[datetime] = None,
-    ):
-        self.id = id if id else str(uuid.uuid4())
-        self.username = username
-        self.hashed_password = hashed_password
-        self.created_at = created_at if created_at else datetime.now()
+    username: str
+    hashed_password: str
+    id: str = field(default_factory=lambda: str(_UUID4()))
+    created_at: Optional[datetime] = field(default_factory=_now)
 
     def __str__(self) -> str:
         return f"<User {self.username}>"
@@ -1,14 +1,33 @@
+from dotenv import load_dotenv
+
+# Load environment variables once, before importing modules that read them
+load_dotenv()
+
+import logging
+import logging.handlers
 import os
+import queue
 from contextlib import asynccontextmanager
 
 from auth import router as auth_router
 from chat import router as chat_router
-from database import close_mongo, init_db, init_mongo
-from dotenv import load_dotenv
-from fastapi import FastAPI
+from database import close_db, close_mongo, init_db, init_mongo
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-load_dotenv()
+# Log records are handed to a background thread through a queue so that
+# writing log output never blocks the event loop
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+# Records arrive already formatted by the QueueHandler
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+
+# Default to INFO in production so debug logging short-circuits before formatting
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+)
 
 
 @asynccontextmanager
@@ -20,6 +39,8 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     await close_mongo()
+    await close_db()
+    _log_listener.stop()
 
 
 app = FastAPI(
@@ -45,8 +66,11 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Only what the frontend sends, so preflight responses are static and
+    # browsers can cache them for a day
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
 # Include routers
@@ -54,7 +78,11 @@ app.include_router(auth_router)
 app.include_router(chat_router)
 
 
+# Health probes get the same pre-encoded body every time
+_HEALTH_BYTES = b'{"status":"healthy"}'
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")